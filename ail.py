@@ -0,0 +1,352 @@
+# ail.py - One command line for the error report, sales pipeline and scraper
+# Heavy imports (pandas, requests, bs4) load only inside the subcommand that needs them
+#
+#   python ail.py report [results.csv]
+#   python ail.py pipeline sales.csv more.csv --group-by month,region
+#   python ail.py scrape https://example.com -o links.txt
+#   python ail.py serve                      # long-lived worker on a per-user socket file
+#   AIL_WORKER=/tmp/ail-1000/worker.sock python ail.py pipeline sales.csv
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# examples/ and metrics/ are plain script folders, not packages - each module
+# is imported from its own directory so its sibling imports keep working
+MODULE_DIRS = {
+    'error_tracking': os.path.join(ROOT, 'metrics'),
+    'instrumentation': os.path.join(ROOT, 'metrics'),
+    'sales_aggregation': os.path.join(ROOT, 'examples', '04_data_processing'),
+    'smart_pipeline': os.path.join(ROOT, 'examples', '04_data_processing'),
+    'learning_scraper': os.path.join(ROOT, 'examples', '03_web_scraping'),
+}
+
+DEFAULT_RESULTS = os.path.join(ROOT, 'metrics', 'results.csv')
+
+
+def _load(name):
+    module = sys.modules.get(name)
+    if module is None:
+        directory = MODULE_DIRS[name]
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+        module = __import__(name)
+    return module
+
+
+def _stats(args):
+    if not getattr(args, 'metrics', None):
+        return None
+    return _load('instrumentation').Stats()
+
+
+def _write_metrics(args, stats):
+    if stats is not None:
+        stats.write_prometheus(args.metrics)
+
+
+def run_report(path):
+    error_tracking = _load('error_tracking')
+    rows = error_tracking.load_results(path)
+    error_tracking.print_report(error_tracking.calculate_reduction(rows))
+    return 0
+
+
+def run_pipeline(args):
+    stats = _stats(args)
+    group_by = [level for level in (args.group_by or '').split(',') if level]
+
+    if len(args.files) == 1 and not group_by and not args.partials and not args.save_partials:
+        result = _load('smart_pipeline').process_sales_data(args.files[0], stats)
+    else:
+        sales_aggregation = _load('sales_aggregation')
+        agg = sales_aggregation.SalesAggregate()
+        # Saved partials need no pandas - only import the pipeline for raw CSVs
+        for path in args.partials:
+            agg.merge(sales_aggregation.SalesAggregate.load(path))
+        if args.files:
+            agg.merge(_load('smart_pipeline').aggregate_sales_files(args.files, args.chunksize, stats))
+        if args.save_partials:
+            agg.save(args.save_partials)
+        result = agg.totals()
+        # Validates the levels before anything is printed
+        summary = agg.rollup(group_by) if group_by else None
+
+    print(f"Total Revenue:  ${result['total_revenue']:,.2f}")
+    print(f"Average Order:  ${result['avg_order']:,.2f}")
+    print(f"Order Count:    {result['num_orders']}")
+    print(f"Data Quality:   {result['data_quality']}")
+
+    if group_by:
+        print(f"\nBy {' / '.join(group_by)}:")
+        for key in sorted(summary, key=lambda k: tuple('' if v is None else v for v in k)):
+            row = summary[key]
+            label = ' / '.join('(none)' if v is None else v for v in key)
+            print(f"  {label:30s} ${row['revenue']:>14,.2f}  {row['orders']:>8} orders  avg ${row['avg_order']:,.2f}")
+
+    _write_metrics(args, stats)
+    return 0
+
+
+def run_scrape(args):
+    stats = _stats(args)
+    results = _load('learning_scraper').scrape_batch(args.urls, args.output, stats)
+    print(f'Total links found: {len(results)}')
+    _write_metrics(args, stats)
+    return 0
+
+
+def _default_worker():
+    # A per-user socket file on POSIX; Windows has no AF_UNIX in CPython, so TCP on loopback
+    if os.name == 'nt':
+        return '127.0.0.1:8765'
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'ail.sock')
+    # Shared /tmp: the socket lives in a 0700 directory that serve() creates
+    return os.path.join('/tmp', f'ail-{os.getuid()}', 'worker.sock')
+
+
+def _owned_by_me(path):
+    # lstat, not stat - never follow a symlink another user planted
+    return os.lstat(path).st_uid == os.getuid()
+
+
+def _parse_address(value):
+    # Returns ('unix', path) or ('tcp', (host, port)); TCP only where AF_UNIX is missing
+    import socket
+
+    host, sep, port = value.rpartition(':')
+    is_tcp = sep and port.isdigit() and os.sep not in value
+    if not is_tcp:
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError(f'Worker address must be host:port on this platform, got {value!r}')
+        return 'unix', value
+    if hasattr(socket, 'AF_UNIX'):
+        raise ValueError(f'Use a socket file path for the worker on this platform, got {value!r}')
+
+    # HEY CLAUDE: The worker runs any subcommand it is sent, with no auth
+    # MISTAKE: Accepted 'serve 0.0.0.0:8765' - anyone on the network could write files
+    # RULE: Loopback only - reject every other host before binding or connecting
+    import ipaddress
+
+    host = host.strip('[]') or '127.0.0.1'
+    try:
+        loopback = host == 'localhost' or ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        raise ValueError(f'Worker must use a loopback address, got {host!r}')
+    return 'tcp', (host, int(port))
+
+
+def _submit(address, argv):
+    # Returns the job's exit code, or None when no worker could be reached -
+    # the caller then runs the job locally. Raises ConnectionError when the
+    # worker took the job and then failed: it may already have run, so a
+    # local rerun could crawl every host or write the output twice.
+    import json
+    import socket
+
+    kind, target = address
+    if kind == 'unix':
+        # HEY CLAUDE: Anyone can create a socket file at a predictable path
+        # RULE: Only talk to a socket we own - the job carries our argv and cwd
+        try:
+            if not _owned_by_me(target):
+                print(f'Warning: ignoring worker socket {target} - owned by another user', file=sys.stderr)
+                return None
+        except FileNotFoundError:
+            return None
+    family = socket.AF_UNIX if kind == 'unix' else socket.AF_INET6 if ':' in target[0] else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as conn:
+        try:
+            conn.settimeout(0.5)
+            conn.connect(target)
+        except OSError:
+            return None
+        try:
+            # Connect fast, but let the job itself take as long as a crawl takes
+            conn.settimeout(None)
+            job = {'argv': argv, 'cwd': os.getcwd()}
+            conn.sendall(json.dumps(job).encode('utf-8') + b'\n')
+            reply = json.loads(conn.makefile('rb').readline())
+            stdout, stderr, code = reply['stdout'], reply['stderr'], reply['exit']
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise ConnectionError(f'worker at {target} dropped the job ({e or type(e).__name__})') from e
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    return code
+
+
+def _run_job(job):
+    import io
+    import logging
+    from contextlib import redirect_stderr, redirect_stdout
+
+    out, err = io.StringIO(), io.StringIO()
+    handler = logging.StreamHandler(err)
+    handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+    logging.getLogger().addHandler(handler)
+    previous = os.getcwd()
+    try:
+        os.chdir(job['cwd'])
+        with redirect_stdout(out), redirect_stderr(err):
+            code = main(job['argv'], allow_worker=False)
+    except SystemExit as e:
+        # Same mapping as the interpreter: None is success, a message is failure
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            err.write(f'{e.code}\n')
+            code = 1
+    except Exception as e:
+        err.write(f'Error: {e}\n')
+        code = 1
+    finally:
+        os.chdir(previous)
+        logging.getLogger().removeHandler(handler)
+    return {'exit': code, 'stdout': out.getvalue(), 'stderr': err.getvalue()}
+
+
+def _make_server(address):
+    import json
+    import socketserver
+
+    class JobHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            job = json.loads(self.rfile.readline())
+            reply = _run_job(job)
+            self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+
+    # CONTEXT: Single-threaded servers on purpose - jobs redirect stdout and
+    #          chdir, which are process-wide, so they must run one at a time
+    kind, target = address
+    if kind == 'tcp':
+        socketserver.TCPServer.allow_reuse_address = True
+        return socketserver.TCPServer(target, JobHandler)
+
+    import stat
+
+    directory = os.path.dirname(os.path.abspath(target))
+    if not os.path.lexists(directory):
+        os.mkdir(directory, 0o700)
+    info = os.lstat(directory)
+    # Our own directory, or a sticky shared one like /tmp where other users
+    # cannot swap our socket out from under us
+    if info.st_uid != os.getuid() and not info.st_mode & stat.S_ISVTX:
+        raise ValueError(f'{directory} is owned by another user - choose another worker path')
+
+    if os.path.lexists(target):
+        if not _owned_by_me(target):
+            raise ValueError(f'{target} is owned by another user - not replacing it')
+        if not stat.S_ISSOCK(os.lstat(target).st_mode):
+            raise ValueError(f'{target} exists and is not a socket')
+        os.unlink(target)
+    # Owner-only from the moment the file exists - a later chmod leaves a window
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(target, JobHandler)
+    finally:
+        os.umask(old_umask)
+    os.chmod(target, 0o600)
+    return server
+
+
+def serve(args):
+    import logging
+
+    log = logging.getLogger('ail.worker')
+    address = _parse_address(args.address)
+
+    # Pay the pandas/requests/bs4 import once, up front, for every later job
+    for name in ('smart_pipeline', 'learning_scraper'):
+        try:
+            _load(name)
+        except ImportError as e:
+            log.warning(f'Not preloading {name}: {e}')
+
+    with _make_server(address) as server:
+        print(f'ail worker listening on {args.address}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if address[0] == 'unix' and os.path.exists(address[1]):
+                os.unlink(address[1])
+    return 0
+
+
+def _build_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='ail', description='AI Inline Learning tools')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('report', help='error reduction report from a results CSV')
+    p.add_argument('results', nargs='?', default=DEFAULT_RESULTS)
+    p.set_defaults(func=lambda args: run_report(args.results))
+
+    p = sub.add_parser('pipeline', help='sales totals and grouped summaries')
+    p.add_argument('files', nargs='*', help='sales CSV files')
+    p.add_argument('--group-by', help='comma list of day, month, year, product, region')
+    p.add_argument('--chunksize', type=int, default=100_000)
+    p.add_argument('--partials', action='append', default=[], help='merge saved partials (repeatable)')
+    p.add_argument('--save-partials', help='write merged partials to this JSON file')
+    p.add_argument('--metrics', help='write Prometheus-style stage metrics to this file')
+    p.set_defaults(func=run_pipeline)
+
+    p = sub.add_parser('scrape', help='collect links from URLs')
+    p.add_argument('urls', nargs='+')
+    p.add_argument('-o', '--output', default='links.txt')
+    p.add_argument('--metrics', help='write Prometheus-style stage metrics to this file')
+    p.set_defaults(func=run_scrape)
+
+    p = sub.add_parser('serve', help='long-lived worker that runs jobs sent by other ail calls')
+    p.add_argument('address', nargs='?', default=_default_worker(),
+                   help='socket path, or loopback host:port on Windows (default %(default)s)')
+    p.set_defaults(func=serve)
+    return parser
+
+
+def main(argv=None, allow_worker=True):
+    argv = sys.argv[1:] if argv is None else list(argv)
+
+    worker = os.environ.get('AIL_WORKER')
+    if argv[:1] == ['--worker'] and len(argv) > 1:
+        worker, argv = argv[1], argv[2:]
+    if allow_worker and worker and argv[:1] != ['serve']:
+        try:
+            address = _parse_address(worker)
+        except ValueError as e:
+            print(f'Error: {e}', file=sys.stderr)
+            return 2
+        try:
+            code = _submit(address, argv)
+        except ConnectionError as e:
+            print(f'Error: {e} - not rerunning locally', file=sys.stderr)
+            return 1
+        if code is not None:
+            return code
+
+    # Fast path: `report [results.csv]` skips argparse (and the re module it
+    # drags in) - this is the call cron and agent hooks make most often
+    if argv[:1] == ['report'] and len(argv) <= 2 and not any(a.startswith('-') for a in argv[1:]):
+        func, args = run_report, argv[1] if len(argv) == 2 else DEFAULT_RESULTS
+    else:
+        args = _build_parser().parse_args(argv)
+        if args.command == 'pipeline' and not (args.files or args.partials):
+            print('Error: give at least one CSV file or --partials file', file=sys.stderr)
+            return 2
+        func = args.func
+    try:
+        return func(args)
+    except (OSError, ValueError) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# sales_aggregation.py - Mergeable partial aggregates for grouped sales reports
+# One pass over the cleaned frames, then any grouping level from the partials
+
+import json
+
+# Finest grain kept in the partials - every coarser cut is rolled up from here
+DIMENSIONS = ('day', 'product', 'region')
+
+# Levels you can ask for in rollup() and how each one is derived from the key
+LEVELS = {
+    'day': lambda key: key[0],
+    'month': lambda key: key[0][:7] if key[0] else None,
+    'year': lambda key: key[0][:4] if key[0] else None,
+    'product': lambda key: key[1],
+    'region': lambda key: key[2],
+}
+
+
+class SalesAggregate:
+
+    def __init__(self):
+        # (day, product, region) -> [revenue_sum, order_count, min_order, max_order]
+        self.groups = {}
+        self.quality = {
+            'unparseable_dates': 0,
+            'negative_revenue_rows': 0,
+            'zero_revenue_rows': 0,
+        }
+
+    def add(self, key, total, count, low, high):
+        group = self.groups.get(key)
+        if group is None:
+            self.groups[key] = [total, count, low, high]
+            return
+        group[0] += total
+        group[1] += count
+        if low < group[2]:
+            group[2] = low
+        if high > group[3]:
+            group[3] = high
+
+    def merge(self, other):
+        # sum, count, min and max are all associative - chunks and files can
+        # be combined in any order and give the same answer as one big frame
+        for key, (total, count, low, high) in other.groups.items():
+            self.add(key, total, count, low, high)
+        for name, value in other.quality.items():
+            self.quality[name] = self.quality.get(name, 0) + value
+        return self
+
+    def rollup(self, by=()):
+        # HEY CLAUDE: Remember the KeyError crashes on column access?
+        # RULE: Always validate required columns exist before any processing
+        # CONTEXT: Same idea here - reject unknown levels up front with the valid list
+        unknown = [level for level in by if level not in LEVELS]
+        if unknown:
+            raise ValueError(f'Unknown grouping levels: {unknown}. Valid: {list(LEVELS)}')
+
+        partials = SalesAggregate()
+        getters = [LEVELS[level] for level in by]
+        for key, (total, count, low, high) in self.groups.items():
+            partials.add(tuple(get(key) for get in getters), total, count, low, high)
+
+        summary = {}
+        for key, (total, count, low, high) in partials.groups.items():
+            summary[key] = {
+                'revenue': round(total, 2),
+                'orders': count,
+                'avg_order': round(total / count, 2) if count else 0,
+                'min_order': round(low, 2),
+                'max_order': round(high, 2),
+            }
+        return summary
+
+    def totals(self):
+        # Same shape as process_sales_data() so callers can switch freely
+        overall = self.rollup().get((), {'revenue': 0, 'orders': 0, 'avg_order': 0})
+        return {
+            'total_revenue': overall['revenue'],
+            'avg_order': overall['avg_order'],
+            'num_orders': overall['orders'],
+            'data_quality': dict(self.quality),
+        }
+
+    def to_dict(self):
+        return {
+            'dimensions': list(DIMENSIONS),
+            'groups': [list(key) + group for key, group in self.groups.items()],
+            'quality': dict(self.quality),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('dimensions') != list(DIMENSIONS):
+            raise ValueError(f"Partials use dimensions {data.get('dimensions')}, expected {list(DIMENSIONS)}")
+        agg = cls()
+        width = len(DIMENSIONS)
+        for row in data['groups']:
+            agg.add(tuple(row[:width]), *row[width:])
+        agg.quality.update(data.get('quality', {}))
+        return agg
+
+    def save(self, path):
+        # HEY CLAUDE: Remember the Windows encoding crash on file write?
+        # RULE: Always encoding='utf-8' for file writes in this project
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
@@ -2,25 +2,80 @@
 # Track your own AI error reduction using the AI Inline Learning pattern
 # Run this against your results.csv to measure effectiveness
 
-import csv
 from collections import defaultdict
 from datetime import datetime
 
 
 RESULTS_FILE = 'results.csv'
 
+# Files up to this size skip the csv module when no field is quoted
+FAST_PATH_BYTES = 256 * 1024
+
 
 def load_results(filepath):
+    # HEY CLAUDE: Remember the cron/agent-hook runs dominated by startup time?
+    # MISTAKE: Imported csv (and re behind it) plus _strptime for a 40-row file
+    # LESSON: On tiny inputs the imports cost more than the parsing
+    # RULE: Keep the small-file path stdlib-light; only import csv when a field is quoted
+    with open(filepath, encoding='utf-8', newline='') as f:
+        text = f.read(FAST_PATH_BYTES + 1)
+        if len(text) <= FAST_PATH_BYTES and not _needs_csv_module(text):
+            return [_convert(row) for row in _split_records(text)]
+        import csv
+        f.seek(0)
+        return [_convert(row) for row in csv.DictReader(f)]
+
+
+def _needs_csv_module(text):
+    # csv only treats a quote as special at the start of a field, and ends a
+    # record on a bare '\r' as well as '\n' - leave both cases to csv
+    if text.startswith('"') or ',"' in text or '\n"' in text or '\r"' in text:
+        return True
+    return '\r' in text.replace('\r\n', '')
+
+
+def _split_records(text):
+    # Split on '\n' only - str.splitlines() also breaks on \x0c, \x85, \u2028
+    # and friends, which csv keeps inside the field
+    lines = [line[:-1] if line.endswith('\r') else line for line in text.split('\n')]
+    header = lines[0].split(',')
     rows = []
-    with open(filepath, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            row['occurred'] = row['occurred'].strip().lower() == 'true'
-            row['session_date'] = datetime.strptime(row['session_date'], '%Y-%m-%d')
-            rows.append(row)
+    for line in lines[1:]:
+        if not line:
+            continue
+        values = line.split(',')
+        # Match csv.DictReader: short rows get None, extra fields go under None
+        row = dict(zip(header, values))
+        if len(values) < len(header):
+            row.update(dict.fromkeys(header[len(values):]))
+        elif len(values) > len(header):
+            row[None] = values[len(header):]
+        rows.append(row)
     return rows
 
 
+def _convert(row):
+    row['occurred'] = row['occurred'].strip().lower() == 'true'
+    row['session_date'] = _parse_date(row['session_date'])
+    return row
+
+
+def _parse_date(value):
+    # Same accept/reject as strptime(value, '%Y-%m-%d') without importing
+    # _strptime: 4-digit year, 1-2 digit month and day, nothing else -
+    # int() alone would also accept ' 5' or '+5'
+    parts = value.split('-')
+    if (
+        len(parts) != 3
+        or len(parts[0]) != 4
+        or not all(1 <= len(p) <= 2 for p in parts[1:])
+        or not all(p.isascii() and p.isdigit() for p in parts)
+    ):
+        raise ValueError(f"time data {value!r} does not match format '%Y-%m-%d'")
+    year, month, day = parts
+    return datetime(int(year), int(month), int(day))
+
+
 def calculate_reduction(rows):
     # Find the first occurrence of each error type
     # Then measure recurrence rate before vs after inline warning was added
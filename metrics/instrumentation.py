@@ -0,0 +1,134 @@
+# instrumentation.py
+# Low-overhead stage timers and counters for the example pipeline and scraper
+# Pass a Stats() into process_sales_data / scrape_batch, then export the numbers
+
+import os
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+
+class _StageTimer:
+    # Plain class instead of @contextmanager - a generator-based context
+    # manager costs roughly 3x more per enter/exit on the hot path
+    __slots__ = ('_stats', '_name', '_start')
+
+    def __init__(self, stats, name):
+        self._stats = stats
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stats.observe(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class Stats:
+
+    def __init__(self, prefix='ail'):
+        self.prefix = prefix
+        self.counters = defaultdict(int)
+        # stage name -> [calls, total_seconds, max_seconds]
+        self.stages = {}
+
+    def incr(self, name, value=1):
+        self.counters[name] += value
+
+    def observe(self, name, seconds):
+        stage = self.stages.get(name)
+        if stage is None:
+            self.stages[name] = [1, seconds, seconds]
+            return
+        stage[0] += 1
+        stage[1] += seconds
+        if seconds > stage[2]:
+            stage[2] = seconds
+
+    def timer(self, name):
+        return _StageTimer(self, name)
+
+    def records(self):
+        # One flat dict per metric - easy to json.dumps() or append to a CSV
+        rows = []
+        for name, (calls, total, slowest) in sorted(self.stages.items()):
+            rows.append({
+                'kind': 'stage',
+                'name': name,
+                'calls': calls,
+                'total_seconds': round(total, 6),
+                'max_seconds': round(slowest, 6),
+            })
+        for name, value in sorted(self.counters.items()):
+            rows.append({'kind': 'counter', 'name': name, 'value': value})
+        return rows
+
+    def to_prometheus(self):
+        # Prometheus text exposition format, suitable for the node_exporter
+        # textfile collector or a plain scrape endpoint
+        p = self.prefix
+        lines = []
+        if self.stages:
+            lines.append(f'# TYPE {p}_stage_seconds summary')
+            for name, (calls, total, _) in sorted(self.stages.items()):
+                lines.append(f'{p}_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+                lines.append(f'{p}_stage_seconds_count{{stage="{name}"}} {calls}')
+            lines.append(f'# TYPE {p}_stage_seconds_max gauge')
+            for name, (_, _, slowest) in sorted(self.stages.items()):
+                lines.append(f'{p}_stage_seconds_max{{stage="{name}"}} {slowest:.6f}')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'# TYPE {p}_{name}_total counter')
+            # Integer counts stay exact - {:g} would print 123456789 as 1.23457e+08
+            text = str(value) if isinstance(value, int) else repr(float(value))
+            lines.append(f'{p}_{name}_total {text}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        # HEY CLAUDE: Remember the Windows encoding crash on file write?
+        # RULE: Always encoding='utf-8' for file writes in this project
+        # CONTEXT: Write-then-rename so a textfile collector never reads half a file
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+def stage(stats, name):
+    # stats=None keeps the hot path free of timing work when not instrumenting
+    return stats.timer(name) if stats is not None else nullcontext()
+
+
+def measure_overhead(iterations=200_000):
+    # Per-call cost of a timed stage vs the disabled path (stage(None, ...)
+    # returns a nullcontext). Returns seconds per call.
+    stats = Stats()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with stats.timer('bench'):
+            pass
+    enabled = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with stage(None, 'bench'):
+            pass
+    disabled = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        stats.incr('bench')
+    counter = (time.perf_counter() - start) / iterations
+
+    return {'timer': enabled, 'disabled': disabled, 'counter': counter}
+
+
+if __name__ == '__main__':
+    cost = measure_overhead()
+    print(f"Timed stage:    {cost['timer'] * 1e9:,.0f} ns per call")
+    print(f"Disabled stage: {cost['disabled'] * 1e9:,.0f} ns per call")
+    print(f"Counter incr:   {cost['counter'] * 1e9:,.0f} ns per call")
+    # The cheapest instrumented stage is a BeautifulSoup parse or a CSV read,
+    # both well above 1 ms - the 1% target means under 10 us per stage
+    print(f"Overhead on a 1 ms stage: {cost['timer'] / 1e-3:.2%}")
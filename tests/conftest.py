@@ -0,0 +1,24 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def load_module():
+    # examples/ and metrics/ are script folders, not packages - load a module
+    # from its file, with its own folder on sys.path for sibling imports
+    def load(relative_path):
+        path = REPO_ROOT / relative_path
+        folder = str(path.parent)
+        if folder not in sys.path:
+            sys.path.insert(0, folder)
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return load
@@ -0,0 +1,145 @@
+import os
+import socket
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def ail(load_module):
+    return load_module("ail.py")
+
+
+def test_report_fast_path_skips_argparse(ail, monkeypatch, capsys) -> None:
+    def no_parser():
+        raise AssertionError("report fast path must not build the argparse parser")
+
+    monkeypatch.setattr(ail, "_build_parser", no_parser)
+    assert ail.main(["report", ail.DEFAULT_RESULTS], allow_worker=False) == 0
+    assert "OVERALL:" in capsys.readouterr().out
+
+
+def test_report_on_missing_file_prints_error(ail, tmp_path, capsys) -> None:
+    assert ail.main(["report", str(tmp_path / "nope.csv")], allow_worker=False) == 1
+    err = capsys.readouterr().err
+    assert err.startswith("Error: ") and "nope.csv" in err
+
+
+def test_pipeline_without_inputs_exits_2(ail, capsys) -> None:
+    assert ail.main(["pipeline"], allow_worker=False) == 2
+    assert "at least one CSV file" in capsys.readouterr().err
+
+
+def test_run_job_captures_output_and_restores_cwd(ail, tmp_path) -> None:
+    before = os.getcwd()
+    reply = ail._run_job({"argv": ["report", ail.DEFAULT_RESULTS], "cwd": str(tmp_path)})
+    assert reply["exit"] == 0
+    assert "OVERALL:" in reply["stdout"]
+    assert os.getcwd() == before
+
+    assert ail._run_job({"argv": ["report", "--help"], "cwd": str(tmp_path)})["exit"] == 0
+    bad = ail._run_job({"argv": ["nope"], "cwd": str(tmp_path)})
+    assert bad["exit"] == 2
+    assert "invalid choice" in bad["stderr"]
+
+
+def test_run_job_maps_bare_system_exit_to_success(ail, monkeypatch, tmp_path) -> None:
+    def exit_quietly(path):
+        raise SystemExit()
+
+    monkeypatch.setattr(ail, "run_report", exit_quietly)
+    assert ail._run_job({"argv": ["report"], "cwd": str(tmp_path)})["exit"] == 0
+
+
+def test_non_loopback_tcp_worker_is_rejected(ail, monkeypatch) -> None:
+    monkeypatch.delattr(socket, "AF_UNIX", raising=False)
+    assert ail._parse_address("127.0.0.1:8765") == ("tcp", ("127.0.0.1", 8765))
+    with pytest.raises(ValueError):
+        ail._parse_address("0.0.0.0:8765")
+    with pytest.raises(ValueError):
+        ail._parse_address("example.com:8765")
+
+
+unix_only = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs AF_UNIX sockets")
+
+
+@unix_only
+def test_worker_round_trip_over_private_unix_socket(ail, tmp_path, capsys) -> None:
+    path = str(tmp_path / "ail.sock")
+    server = ail._make_server(ail._parse_address(path))
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert ail.main(["--worker", path, "report", ail.DEFAULT_RESULTS]) == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert "OVERALL:" in capsys.readouterr().out
+
+
+@unix_only
+def test_dropped_worker_is_an_error_not_a_local_rerun(ail, tmp_path, capsys) -> None:
+    path = str(tmp_path / "dead.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+
+    def accept_and_drop():
+        conn, _ = listener.accept()
+        conn.close()
+
+    thread = threading.Thread(target=accept_and_drop, daemon=True)
+    thread.start()
+    try:
+        assert ail.main(["--worker", path, "report", ail.DEFAULT_RESULTS]) == 1
+        thread.join(timeout=5)
+    finally:
+        listener.close()
+    captured = capsys.readouterr()
+    assert "OVERALL:" not in captured.out
+    assert "dropped the job" in captured.err
+
+
+@unix_only
+def test_unreachable_worker_falls_back_to_local_run(ail, tmp_path, capsys) -> None:
+    missing = str(tmp_path / "missing.sock")
+    assert ail.main(["--worker", missing, "report", ail.DEFAULT_RESULTS]) == 0
+
+    # A stale socket file with nobody listening refuses the connect
+    stale = str(tmp_path / "stale.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(stale)
+    listener.close()
+    assert ail.main(["--worker", stale, "report", ail.DEFAULT_RESULTS]) == 0
+    assert capsys.readouterr().out.count("OVERALL:") == 2
+
+
+@unix_only
+def test_socket_owned_by_another_user_is_neither_used_nor_replaced(ail, tmp_path, monkeypatch, capsys) -> None:
+    path = str(tmp_path / "ail.sock")
+    server = ail._make_server(ail._parse_address(path))
+    try:
+        monkeypatch.setattr(os, "getuid", lambda: os.lstat(path).st_uid + 1)
+        # serve_forever is not running: a connect attempt would hang until timeout
+        assert ail.main(["--worker", path, "report", ail.DEFAULT_RESULTS]) == 0
+        assert "owned by another user" in capsys.readouterr().err
+        with pytest.raises(ValueError, match="owned by another user"):
+            ail._make_server(ail._parse_address(path))
+        assert os.path.exists(path)
+    finally:
+        server.server_close()
+
+
+@unix_only
+def test_server_creates_private_socket_directory(ail, tmp_path, monkeypatch) -> None:
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    assert ail._default_worker() == f"/tmp/ail-{os.getuid()}/worker.sock"
+
+    path = str(tmp_path / "private" / "worker.sock")
+    server = ail._make_server(ail._parse_address(path))
+    try:
+        assert os.stat(tmp_path / "private").st_mode & 0o777 == 0o700
+        assert os.stat(path).st_mode & 0o777 == 0o600
+    finally:
+        server.server_close()
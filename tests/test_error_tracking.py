@@ -0,0 +1,50 @@
+import csv
+from datetime import datetime
+
+import pytest
+
+
+def test_fast_path_matches_csv_module(tmp_path, load_module) -> None:
+    error_tracking = load_module("metrics/error_tracking.py")
+    header = "session_date,project,ai_tool,error_type,occurred,description\n"
+    row = '2024-12-26,PyToolbelt,Claude,unicode,True,caused "missing terminator" error\n'
+    plain = tmp_path / "plain.csv"
+    plain.write_text(header + row, encoding="utf-8")
+    quoted = tmp_path / "quoted.csv"
+    quoted.write_text(header + row + '2024-12-27,PyToolbelt,Claude,unicode,False,"fixed, finally"\n', encoding="utf-8")
+
+    fast = error_tracking.load_results(plain)
+    slow = error_tracking.load_results(quoted)
+    assert fast == slow[:1]
+    assert slow[1]["description"] == "fixed, finally"
+    assert slow[1]["occurred"] is False
+
+
+def test_fast_path_splits_records_like_csv_dictreader(tmp_path, load_module) -> None:
+    error_tracking = load_module("metrics/error_tracking.py")
+    text = (
+        "session_date,project,ai_tool,error_type,occurred,description\r\n"
+        "2024-12-26,PyToolbelt,Claude,unicode,True,page\x0cbreak and   separator\r\n"
+        "2024-12-27,PyToolbelt,Claude,unicode,False\r\n"
+        "2024-12-28,PyToolbelt,Claude,unicode,False,extra,fields\r\n"
+        "\r\n"
+    )
+    assert not error_tracking._needs_csv_module(text)
+    with open(tmp_path / "expected.csv", "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    with open(tmp_path / "expected.csv", encoding="utf-8", newline="") as f:
+        expected = list(csv.DictReader(f))
+
+    assert error_tracking._split_records(text) == expected
+    assert error_tracking._needs_csv_module("a,b\rc,d\n")
+
+
+def test_session_date_parsing_matches_strptime(load_module) -> None:
+    error_tracking = load_module("metrics/error_tracking.py")
+    for value in ["2024-01-05", "2024-1-5", "2024-12-31"]:
+        assert error_tracking._parse_date(value) == datetime.strptime(value, "%Y-%m-%d")
+    for value in ["2024-1-5 ", " 2024-01-05", "2024-+1-05", "24-01-05", "2024-001-05", "2024-13-01", "2024/01/05"]:
+        with pytest.raises(ValueError):
+            datetime.strptime(value, "%Y-%m-%d")
+        with pytest.raises(ValueError):
+            error_tracking._parse_date(value)
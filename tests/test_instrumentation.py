@@ -0,0 +1,34 @@
+def test_stats_records_and_prometheus_export(tmp_path, load_module) -> None:
+    instrumentation = load_module("metrics/instrumentation.py")
+    stats = instrumentation.Stats()
+    with stats.timer("parse"):
+        pass
+    with stats.timer("parse"):
+        pass
+    stats.incr("bytes_read", 512)
+
+    records = stats.records()
+    assert records[0]["name"] == "parse" and records[0]["calls"] == 2
+    assert records[1] == {"kind": "counter", "name": "bytes_read", "value": 512}
+
+    out = tmp_path / "ail.prom"
+    stats.write_prometheus(out)
+    text = out.read_text(encoding="utf-8")
+    assert 'ail_stage_seconds_count{stage="parse"} 2' in text
+    assert "ail_bytes_read_total 512" in text
+
+
+def test_large_counters_stay_exact_and_stage_can_be_disabled(load_module) -> None:
+    instrumentation = load_module("metrics/instrumentation.py")
+    stats = instrumentation.Stats()
+    stats.incr("bytes_read", 123456789)
+    stats.incr("pages_scraped")
+
+    assert stats.records()[1] == {"kind": "counter", "name": "pages_scraped", "value": 1}
+    assert "ail_bytes_read_total 123456789\n" in stats.to_prometheus()
+
+    with instrumentation.stage(stats, "fetch"):
+        pass
+    with instrumentation.stage(None, "fetch"):
+        pass
+    assert stats.stages["fetch"][0] == 1
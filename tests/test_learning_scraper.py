@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+requests = pytest.importorskip("requests")
+pytest.importorskip("bs4")
+
+PAGE = b'<a href="https://example.com/next">next</a><a>no href</a>'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _response(url, status, headers=None):
+    response = requests.models.Response()
+    response.url = url
+    response.status_code = status
+    response.reason = "test"
+    response.headers.update(headers or {})
+    response._content = PAGE if status == 200 else b""
+    return response
+
+
+@pytest.fixture
+def scraper(load_module, monkeypatch):
+    module = load_module("examples/03_web_scraping/learning_scraper.py")
+    clock = FakeClock()
+    monkeypatch.setattr(module, "time", clock)
+    # Always take the longest jittered backoff so waits are predictable
+    monkeypatch.setattr(module.random, "uniform", lambda low, high: high)
+    module.clock = clock
+    return module
+
+
+def _serve(monkeypatch, scraper, plan):
+    # plan: url -> list of (status, headers), one entry per attempt
+    calls = []
+
+    def fake_get(url, timeout, headers):
+        calls.append((url, scraper.clock.now))
+        status, extra = plan[url].pop(0) if len(plan[url]) > 1 else plan[url][0]
+        return _response(url, status, extra)
+
+    monkeypatch.setattr(scraper.requests, "get", fake_get)
+    return calls
+
+
+def test_parse_retry_after_seconds_and_http_date(scraper) -> None:
+    assert scraper._parse_retry_after("120") == 120.0
+    assert scraper._parse_retry_after("-5") == 0.0
+    assert scraper._parse_retry_after(None) is None
+    assert scraper._parse_retry_after("soon") is None
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 <= scraper._parse_retry_after(later) <= 60
+
+
+def test_scheduler_delay_stays_within_politeness_bounds(scraper) -> None:
+    scheduler = scraper.HostScheduler()
+    for _ in range(20):
+        scheduler.record("fast.test", 0.05, ok=True)
+        assert scraper.MIN_DELAY <= scheduler.hosts["fast.test"].delay <= scraper.MAX_DELAY
+    assert scheduler.hosts["fast.test"].delay == scraper.MIN_DELAY
+
+    for _ in range(20):
+        scheduler.record("bad.test", 0.05, ok=False)
+        assert scraper.MIN_DELAY <= scheduler.hosts["bad.test"].delay <= scraper.MAX_DELAY
+    assert scheduler.hosts["bad.test"].delay == scraper.MAX_DELAY
+
+    scheduler.record("slow.test", scraper.SLOW_LATENCY + 1, ok=True)
+    assert scheduler.hosts["slow.test"].delay > scraper.REQUEST_DELAY
+
+
+def test_pop_ready_prefers_a_free_host(scraper) -> None:
+    scheduler = scraper.HostScheduler()
+    scheduler.record("busy.test", 0.1, ok=True)
+    pending = scraper.deque([(0, "http://busy.test/", "busy.test", 0), (1, "http://free.test/", "free.test", 0)])
+    assert scheduler.pop_ready(pending)[1] == "http://free.test/"
+    start = scraper.clock.now
+    assert scheduler.pop_ready(pending)[1] == "http://busy.test/"
+    assert scraper.clock.now - start == pytest.approx(scheduler.hosts["busy.test"].delay)
+
+
+def test_503_with_retry_after_is_retried_once_and_keeps_input_order(scraper, monkeypatch, tmp_path, load_module) -> None:
+    calls = _serve(monkeypatch, scraper, {
+        "http://a.test/": [(503, {"Retry-After": "5"}), (200, None)],
+        "http://b.test/": [(200, None)],
+    })
+    stats = load_module("metrics/instrumentation.py").Stats()
+    links = scraper.scrape_batch(["http://a.test/", "http://b.test/"], tmp_path / "links.txt", stats=stats)
+
+    assert [url for url, _ in calls] == ["http://a.test/", "http://b.test/", "http://a.test/"]
+    assert calls[2][1] - calls[0][1] >= 5
+    assert links == ["https://example.com/next", "https://example.com/next"]
+    assert (tmp_path / "links.txt").read_text(encoding="utf-8").count("\n") == 2
+
+    assert {"fetch", "parse", "extract", "rate_limit_sleep", "write"} <= set(stats.stages)
+    assert stats.counters["retries"] == 1
+    assert stats.counters["pages_scraped"] == 2
+    assert stats.counters["bytes_read"] == 2 * len(PAGE)
+
+
+def test_same_host_gaps_stay_within_bounds(scraper, monkeypatch, tmp_path) -> None:
+    urls = [f"http://a.test/{i}" for i in range(6)]
+    calls = _serve(monkeypatch, scraper, {url: [(200, None)] for url in urls})
+    scraper.scrape_batch(urls, tmp_path / "links.txt")
+
+    gaps = [later[1] - earlier[1] for earlier, later in zip(calls, calls[1:])]
+    assert all(scraper.MIN_DELAY <= gap <= scraper.MAX_DELAY for gap in gaps)
+
+
+def test_gives_up_after_max_retries(scraper, monkeypatch, tmp_path) -> None:
+    calls = _serve(monkeypatch, scraper, {"http://a.test/": [(503, None)]})
+    assert scraper.scrape_batch(["http://a.test/"], tmp_path / "links.txt") == []
+    assert len(calls) == scraper.MAX_RETRIES + 1
+
+
+def test_skips_retry_after_beyond_limit(scraper, monkeypatch, tmp_path) -> None:
+    too_long = str(int(scraper.MAX_RETRY_AFTER) + 1)
+    calls = _serve(monkeypatch, scraper, {"http://a.test/": [(429, {"Retry-After": too_long})]})
+    assert scraper.scrape_batch(["http://a.test/"], tmp_path / "links.txt") == []
+    assert len(calls) == 1
+
+
+def test_forbidden_host_is_scored_as_unhealthy(scraper, monkeypatch, tmp_path) -> None:
+    calls = _serve(monkeypatch, scraper, {
+        "http://a.test/1": [(403, None)],
+        "http://a.test/2": [(200, None)],
+    })
+    scraper.scrape_batch(["http://a.test/1", "http://a.test/2"], tmp_path / "links.txt")
+
+    # A healthy answer would have tightened the delay below REQUEST_DELAY
+    assert calls[1][1] - calls[0][1] == scraper.MAX_DELAY
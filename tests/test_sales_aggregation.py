@@ -0,0 +1,104 @@
+def test_partials_merge_and_roll_up(tmp_path, load_module) -> None:
+    sales_aggregation = load_module("examples/04_data_processing/sales_aggregation.py")
+    first = sales_aggregation.SalesAggregate()
+    first.add(("2024-01-05", "apple", "north"), 20.0, 2, 5.0, 15.0)
+    second = sales_aggregation.SalesAggregate()
+    second.add(("2024-01-20", "apple", "south"), 3.0, 1, 3.0, 3.0)
+    second.add(("2024-02-01", "pear", "north"), 7.0, 1, 7.0, 7.0)
+
+    merged = first.merge(second)
+    assert merged.rollup(["month"])[("2024-01",)] == {
+        "revenue": 23.0, "orders": 3, "avg_order": 7.67, "min_order": 3.0, "max_order": 15.0,
+    }
+    assert merged.rollup(["region"])[("north",)]["revenue"] == 27.0
+    assert merged.totals()["num_orders"] == 4
+
+    path = tmp_path / "partials.json"
+    merged.save(path)
+    assert sales_aggregation.SalesAggregate.load(path).rollup(["product", "year"]) == merged.rollup(["product", "year"])
+
+
+def _pipeline(load_module):
+    import pytest
+
+    pytest.importorskip("pandas")
+    return load_module("examples/04_data_processing/smart_pipeline.py")
+
+
+def test_chunked_files_match_one_pass_and_process_sales_data(tmp_path, load_module) -> None:
+    smart_pipeline = _pipeline(load_module)
+    first = tmp_path / "first.csv"
+    first.write_text(
+        "date,price,quantity,product,region\n"
+        "01/02/2024,10,2,101,north\n"
+        "2024-03-05,5,1,,south\n"
+        "bad,4,x,101,south\n",
+        encoding="utf-8",
+    )
+    # No product/region columns at all - those keys group as None
+    second = tmp_path / "second.csv"
+    second.write_text("date,price,quantity\n2024-03-06,7,3\n", encoding="utf-8")
+    third = tmp_path / "third.csv"
+    third.write_text("date,price,quantity,product\n2024-03-07,1,1,101\n", encoding="utf-8")
+    files = [first, second, third]
+
+    whole = smart_pipeline.aggregate_sales_files(files)
+    chunked = smart_pipeline.aggregate_sales_files(files, chunksize=1)
+    for levels in ([], ["day"], ["month", "region"], ["product"]):
+        assert chunked.rollup(levels) == whole.rollup(levels)
+    assert chunked.quality == whole.quality
+
+    assert set(whole.rollup(["product"])) == {("101",), (None,)}
+    assert whole.rollup(["day"])[("2024-01-02",)]["revenue"] == 20.0
+    # first.csv is MM/DD/YYYY from its first date on - the ISO row and 'bad' both fail
+    assert whole.quality["unparseable_dates"] == 2
+
+    totals = {"total_revenue": 0, "num_orders": 0, "unparseable_dates": 0}
+    for path in files:
+        result = smart_pipeline.process_sales_data(path)
+        totals["total_revenue"] += result["total_revenue"]
+        totals["num_orders"] += result["num_orders"]
+        totals["unparseable_dates"] += result["data_quality"]["unparseable_dates"]
+    assert whole.totals()["total_revenue"] == totals["total_revenue"]
+    assert whole.totals()["num_orders"] == totals["num_orders"]
+    assert whole.quality["unparseable_dates"] == totals["unparseable_dates"]
+
+
+def test_mixed_day_month_conventions_stay_flagged(tmp_path, load_module) -> None:
+    smart_pipeline = _pipeline(load_module)
+    path = tmp_path / "mixed.csv"
+    path.write_text("date,price,quantity\n01/02/2024,1,1\n13/02/2024,1,1\n", encoding="utf-8")
+
+    assert smart_pipeline.process_sales_data(path)["data_quality"]["unparseable_dates"] == 1
+    for chunksize in (1, 100):
+        agg = smart_pipeline.aggregate_sales_files([path], chunksize=chunksize)
+        assert agg.quality["unparseable_dates"] == 1
+        assert set(agg.rollup(["day"])) == {("2024-01-02",), (None,)}
+
+
+def test_latin1_fallback_in_late_chunk_does_not_double_count(tmp_path, load_module) -> None:
+    smart_pipeline = _pipeline(load_module)
+    # Enough UTF-8 rows that the bad byte lands well past pandas' first read buffer
+    rows = ["2024-01-01,1,1,apple,north"] * 20_000 + ["2024-01-02,2,1,caf\xe9,south"]
+    path = tmp_path / "excel_export.csv"
+    path.write_bytes(("date,price,quantity,product,region\n" + "\n".join(rows) + "\n").encode("latin-1"))
+
+    stats = load_module("metrics/instrumentation.py").Stats()
+    agg = smart_pipeline.aggregate_sales_files([path], chunksize=1_000, stats=stats)
+    assert agg.totals()["num_orders"] == 20_001
+    assert stats.counters["rows_parsed"] == 20_001
+    assert stats.counters["encoding_fallbacks"] == 1
+    assert agg.rollup(["product"])[("café",)]["revenue"] == 2.0
+
+
+def test_process_sales_data_records_stages_and_counters(tmp_path, load_module) -> None:
+    smart_pipeline = _pipeline(load_module)
+    path = tmp_path / "excel_export.csv"
+    path.write_bytes("date,price,quantity,product\n2024-01-02,2,3,caf\xe9\n".encode("latin-1"))
+
+    stats = load_module("metrics/instrumentation.py").Stats()
+    assert smart_pipeline.process_sales_data(path, stats)["total_revenue"] == 6.0
+    assert {"read_csv", "read_csv_fallback", "parse_dates", "clean_numeric"} <= set(stats.stages)
+    assert stats.counters["bytes_read"] == path.stat().st_size
+    assert stats.counters["encoding_fallbacks"] == 1
+    assert stats.counters["rows_parsed"] == 1